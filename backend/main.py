@@ -4,12 +4,14 @@
 
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 import numpy as np
 import pandas as pd
 from datetime import datetime, date
 import json
+from dataclasses import replace
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -29,11 +31,12 @@ from simulation_core import (
 
 # Import molecular database and sub-atomic designer
 from molecular_database import molecular_db
-from sub_atomic_designer import sub_atomic_designer, MaterialTarget
+from sub_atomic_designer import sub_atomic_designer, MaterialTarget, PROPERTY_NAMES
 from rwanda_demo_molecules import (
     initialize_rwanda_demo_molecules,
     get_rwanda_agricultural_recommendations,
     get_rwanda_molecule_statistics,
+    get_compact_demo_molecules,
     RWANDA_DEMO_MOLECULES
 )
 
@@ -181,6 +184,10 @@ class MoleculeSearchRequest(BaseModel):
     max_atoms: Optional[int] = Field(None, description="Maximum number of atoms")
     limit: int = Field(20, ge=1, le=100, description="Maximum results to return")
 
+class MoleculeBatchSearchRequest(BaseModel):
+    searches: List[MoleculeSearchRequest] = Field(..., min_length=1, max_length=50,
+                                                  description="Searches to run in one request")
+
 class MolecularLibraryRequest(BaseModel):
     base_molecules: List[str] = Field(..., description="List of base molecule strings")
     applications: List[str] = Field(..., description="Target applications: packaging, mulch, irrigation, etc.")
@@ -717,25 +724,39 @@ async def upload_molecule_file_endpoint(file: UploadFile = File(...),
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _run_molecule_search(request: MoleculeSearchRequest) -> Dict[str, Any]:
+    """Run one molecule search and trim it to the requested limit"""
+    molecules = molecular_db.search_molecules(
+        query=request.query,
+        category=request.category,
+        min_atoms=request.min_atoms,
+        max_atoms=request.max_atoms
+    )
+    
+    # Limit results
+    limited_molecules = molecules[:request.limit]
+    
+    return {
+        "total_found": len(molecules),
+        "returned_count": len(limited_molecules),
+        "molecules": limited_molecules
+    }
+
 @app.post("/search_molecules", summary="Search Molecules in Database")
 async def search_molecules_endpoint(request: MoleculeSearchRequest):
     """Search for molecules in the database"""
     try:
-        molecules = molecular_db.search_molecules(
-            query=request.query,
-            category=request.category,
-            min_atoms=request.min_atoms,
-            max_atoms=request.max_atoms
-        )
-        
-        # Limit results
-        limited_molecules = molecules[:request.limit]
-        
+        return {"success": True, **_run_molecule_search(request)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/search_molecules/batch", summary="Run Several Molecule Searches")
+async def search_molecules_batch_endpoint(request: MoleculeBatchSearchRequest):
+    """Run several molecule searches in one round-trip; results follow request order"""
+    try:
         return {
             "success": True,
-            "total_found": len(molecules),
-            "returned_count": len(limited_molecules),
-            "molecules": limited_molecules
+            "results": [_run_molecule_search(search) for search in request.searches]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -874,15 +895,19 @@ async def create_molecular_library_endpoint(request: MolecularLibraryRequest):
                 # Default balanced target
                 target = MaterialTarget()
             
-            # Apply custom requirements
-            for prop, value in request.performance_requirements.items():
-                if hasattr(target, prop):
-                    setattr(target, prop, value)
+            # Apply custom requirements (targets are frozen, so build a copy)
+            overrides = {
+                prop: value for prop, value in request.performance_requirements.items()
+                if prop in PROPERTY_NAMES
+            }
+            if overrides:
+                target = replace(target, **overrides)
             
             targets.append(target)
         
-        # Create molecular library
-        library = sub_atomic_designer.create_molecular_library(
+        # Create molecular library off the event loop; designs can take a while
+        library = await run_in_threadpool(
+            sub_atomic_designer.create_molecular_library,
             request.base_molecules,
             targets
         )
@@ -923,13 +948,17 @@ async def initialize_rwanda_molecules_endpoint():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/rwanda_demo_molecules", summary="Get Rwanda Demo Molecules")
-async def get_rwanda_demo_molecules_endpoint():
-    """Get information about all available Rwanda-relevant demo molecules"""
+async def get_rwanda_demo_molecules_endpoint(compact: bool = False):
+    """Get information about all available Rwanda-relevant demo molecules
+    
+    With compact=true each molecule_string is replaced by a "geometry" object
+    (elements, float32 centroid, base64 float16 offsets from it).
+    """
     try:
         return {
             "success": True,
             "total_molecules": len(RWANDA_DEMO_MOLECULES),
-            "molecules": RWANDA_DEMO_MOLECULES
+            "molecules": get_compact_demo_molecules() if compact else RWANDA_DEMO_MOLECULES
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
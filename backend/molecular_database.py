@@ -28,6 +28,8 @@ class MolecularDatabase:
     
     def __init__(self, db_path: str = "molecular_database.db"):
         self.db_path = db_path
+        # Bumped on every write to the molecules table so callers can cache derived data
+        self.version = 0
         self.init_database()
     
     def init_database(self):
@@ -280,44 +282,11 @@ class MolecularDatabase:
         cursor = conn.cursor()
         
         try:
-            # Parse molecule and calculate properties
-            atom_data = parse_molecule_string(molecule_string)
-            descriptors = calculate_molecular_descriptors(atom_data)
-            
-            # Insert main molecule record
-            cursor.execute('''
-                INSERT INTO molecules (name, molecule_string, category, description, 
-                                     molecular_weight, num_atoms, file_hash, file_format, 
-                                     source_file_name, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                name, molecule_string, category, description,
-                descriptors.get('molecular_weight', 0),
-                descriptors.get('num_atoms', 0),
-                kwargs.get('file_hash'),
-                kwargs.get('file_format'),
-                kwargs.get('source_file_name'),
-                json.dumps(kwargs)
-            ))
-            
-            molecule_id = cursor.lastrowid
-            
-            # Store atomic properties for sub-atomic level design
-            for i, atom in enumerate(atom_data):
-                cursor.execute('''
-                    INSERT INTO atomic_properties (molecule_id, atom_index, element_symbol,
-                                                 x_coord, y_coord, z_coord, partial_charge)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    molecule_id, i, atom['symbol'],
-                    atom['x'], atom['y'], atom['z'],
-                    atom.get('charge', 0.0)
-                ))
-            
-            # Calculate and store bonds
-            self._calculate_and_store_bonds(cursor, molecule_id, atom_data)
+            molecule_id = self._insert_molecule(cursor, name, molecule_string, category,
+                                                description, **kwargs)
             
             conn.commit()
+            self.version += 1
             logger.info(f"Added molecule '{name}' with ID {molecule_id}")
             return molecule_id
             
@@ -328,6 +297,83 @@ class MolecularDatabase:
         finally:
             conn.close()
     
+    def add_molecules_bulk(self, molecules: List[Dict[str, Any]]) -> List[int]:
+        """Add several molecules in a single transaction
+        
+        Each entry needs 'name' and 'molecule_string' and may carry 'category',
+        'description' and any extra add_molecule keyword arguments. Either all
+        molecules are stored or none are.
+        """
+        if not molecules:
+            return []
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            molecule_ids = []
+            for molecule in molecules:
+                extra = {k: v for k, v in molecule.items()
+                         if k not in ('name', 'molecule_string', 'category', 'description')}
+                molecule_ids.append(self._insert_molecule(
+                    cursor, molecule['name'], molecule['molecule_string'],
+                    molecule.get('category', 'general'), molecule.get('description'),
+                    **extra
+                ))
+            
+            conn.commit()
+            self.version += 1
+            logger.info(f"Added {len(molecule_ids)} molecules in bulk")
+            return molecule_ids
+            
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error adding molecules in bulk: {e}")
+            raise
+        finally:
+            conn.close()
+    
+    def _insert_molecule(self, cursor, name: str, molecule_string: str, category: str,
+                        description: str, **kwargs) -> int:
+        """Insert one molecule with its atoms and bonds using an open cursor"""
+        # Parse molecule and calculate properties
+        atom_data = parse_molecule_string(molecule_string)
+        descriptors = calculate_molecular_descriptors(atom_data)
+        
+        # Insert main molecule record
+        cursor.execute('''
+            INSERT INTO molecules (name, molecule_string, category, description, 
+                                 molecular_weight, num_atoms, file_hash, file_format, 
+                                 source_file_name, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            name, molecule_string, category, description,
+            descriptors.get('molecular_weight', 0),
+            descriptors.get('num_atoms', 0),
+            kwargs.get('file_hash'),
+            kwargs.get('file_format'),
+            kwargs.get('source_file_name'),
+            json.dumps(kwargs)
+        ))
+        
+        molecule_id = cursor.lastrowid
+        
+        # Store atomic properties for sub-atomic level design
+        cursor.executemany('''
+            INSERT INTO atomic_properties (molecule_id, atom_index, element_symbol,
+                                         x_coord, y_coord, z_coord, partial_charge)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (molecule_id, i, atom['symbol'], atom['x'], atom['y'], atom['z'],
+             atom.get('charge', 0.0))
+            for i, atom in enumerate(atom_data)
+        ])
+        
+        # Calculate and store bonds
+        self._calculate_and_store_bonds(cursor, molecule_id, atom_data)
+        
+        return molecule_id
+    
     def _calculate_and_store_bonds(self, cursor, molecule_id: int, atom_data: List[Dict]):
         """Calculate and store molecular bonds based on distance"""
         # Bond distance thresholds (in Angstroms)
@@ -425,8 +471,13 @@ class MolecularDatabase:
         return molecule
     
     def search_molecules(self, query: str = None, category: str = None, 
-                        min_atoms: int = None, max_atoms: int = None) -> List[Dict]:
-        """Search molecules with various filters"""
+                        min_atoms: int = None, max_atoms: int = None,
+                        keywords: List[str] = None) -> List[Dict]:
+        """Search molecules with various filters
+        
+        keywords matches molecules whose description contains any of the
+        given words (case-insensitive).
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -449,6 +500,10 @@ class MolecularDatabase:
             sql += " AND num_atoms <= ?"
             params.append(max_atoms)
         
+        if keywords:
+            sql += " AND (" + " OR ".join(["description LIKE ?"] * len(keywords)) + ")"
+            params.extend(f"%{keyword}%" for keyword in keywords)
+        
         sql += " ORDER BY created_at DESC"
         
         cursor.execute(sql, params)
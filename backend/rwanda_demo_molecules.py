@@ -2,9 +2,18 @@
 # Rwanda Quantum Agricultural Intelligence Platform
 # Demo molecules for agricultural applications in Rwanda
 
+import base64
+import copy
 import logging
+import re
+import sys
+import threading
+from collections import Counter
+from functools import lru_cache
+import numpy as np
 from molecular_database import molecular_db
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -71,93 +80,250 @@ RWANDA_DEMO_MOLECULES = {
     }
 }
 
+# Intern the repeated category/application labels so every copy of a label
+# shares one string object and compares by identity first
+for _molecule in RWANDA_DEMO_MOLECULES.values():
+    _molecule["category"] = sys.intern(_molecule["category"])
+    _molecule["applications"] = [sys.intern(app) for app in _molecule["applications"]]
+del _molecule
+
+def _parse_coordinates(molecule_string: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse a molecule string into element symbols and float32 (N, 3) coordinates"""
+    rows = [atom.split() for atom in molecule_string.split(';') if atom.strip()]
+    elements = np.array([row[0] for row in rows], dtype='U2')
+    coords = np.array([row[1:4] for row in rows], dtype=np.float32)
+    # Shared across callers, so guard against accidental in-place edits
+    elements.flags.writeable = False
+    coords.flags.writeable = False
+    return elements, coords
+
+@lru_cache(maxsize=None)
+def get_coords(molecule_key: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Get (elements, coords) arrays for a demo molecule, parsing its string only once"""
+    if molecule_key not in RWANDA_DEMO_MOLECULES:
+        raise KeyError(f"Unknown Rwanda demo molecule: {molecule_key}")
+    return _parse_coordinates(RWANDA_DEMO_MOLECULES[molecule_key]["molecule_string"])
+
+def _compact_coordinates(coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split coordinates into a float32 centroid and float16 offsets from it"""
+    centroid = coords.mean(axis=0, dtype=np.float32)
+    deltas = (coords - centroid).astype(np.float16)
+    centroid.flags.writeable = False
+    deltas.flags.writeable = False
+    return centroid, deltas
+
+@lru_cache(maxsize=None)
+def get_compact_coords(molecule_key: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get (elements, centroid_fp32, deltas_fp16) for a demo molecule
+    
+    Offsets from the centroid fit in float16 with about 1e-3 Angstrom error
+    for molecules of this size.
+    """
+    elements, coords = get_coords(molecule_key)
+    return (elements,) + _compact_coordinates(coords)
+
+def _compact_geometry(molecule_key: str) -> Dict[str, object]:
+    """JSON-ready compact geometry
+    
+    elements is space-separated; deltas_fp16 is base64 of little-endian
+    float16 (x, y, z) rows.
+    """
+    elements, centroid, deltas = get_compact_coords(molecule_key)
+    return {
+        "elements": " ".join(elements.tolist()),
+        # Shortest decimal that round-trips each float32 component
+        "centroid": [float(np.format_float_positional(x)) for x in centroid],
+        "deltas_fp16": base64.b64encode(deltas.astype('<f2').tobytes()).decode('ascii'),
+    }
+
+@lru_cache(maxsize=1)
+def get_compact_demo_molecules() -> Dict[str, Dict]:
+    """RWANDA_DEMO_MOLECULES with each molecule_string replaced by compact geometry
+    
+    Clients rebuild coordinates as centroid + deltas; the geometry is about
+    two thirds the size of the ASCII strings on the wire.
+    """
+    return {
+        key: {**{k: v for k, v in molecule.items() if k != "molecule_string"},
+              "geometry": _compact_geometry(key)}
+        for key, molecule in RWANDA_DEMO_MOLECULES.items()
+    }
+
+# Flat, immutable view of RWANDA_DEMO_MOLECULES for initialization, built once:
+# (name, molecule_string, category, description, applications, rwanda_relevance)
+_ROWS: Tuple[Tuple[str, str, str, str, Tuple[str, ...], str], ...] = tuple(
+    (m["name"], m["molecule_string"], m["category"], m["description"],
+     tuple(m["applications"]), m["rwanda_relevance"])
+    for m in RWANDA_DEMO_MOLECULES.values()
+)
+
 def initialize_rwanda_demo_molecules():
     """Initialize the database with Rwanda-relevant agricultural molecules"""
     logger.info("Initializing Rwanda demo molecules...")
     
-    added_molecules = []
-    
-    for molecule_key, molecule_data in RWANDA_DEMO_MOLECULES.items():
-        try:
-            # Check if molecule already exists
-            existing = molecular_db.search_molecules(query=molecule_data["name"])
-            if existing:
-                logger.info(f"Molecule '{molecule_data['name']}' already exists, skipping...")
-                continue
-            
-            # Add molecule to database
-            molecule_id = molecular_db.add_molecule(
-                name=molecule_data["name"],
-                molecule_string=molecule_data["molecule_string"],
-                category=molecule_data["category"],
-                description=molecule_data["description"]
-            )
-            
-            added_molecules.append({
-                "id": molecule_id,
-                "name": molecule_data["name"],
-                "category": molecule_data["category"],
-                "applications": molecule_data["applications"],
-                "rwanda_relevance": molecule_data["rwanda_relevance"]
-            })
-            
-            logger.info(f"Added molecule: {molecule_data['name']} (ID: {molecule_id})")
-            
-        except Exception as e:
-            logger.error(f"Failed to add molecule {molecule_data['name']}: {e}")
+    # Skip molecules that are already stored
+    existing_names = {m['name'] for m in molecular_db.search_molecules()}
+    new_rows = [row for row in _ROWS if row[0] not in existing_names]
+    if not new_rows:
+        logger.info("All Rwanda demo molecules already exist, skipping...")
+        return []
+    
+    try:
+        molecule_ids = molecular_db.add_molecules_bulk([
+            {"name": name, "molecule_string": molecule_string,
+             "category": category, "description": description}
+            for name, molecule_string, category, description, _, _ in new_rows
+        ])
+    except Exception:
+        logger.exception("Failed to add Rwanda demo molecules")
+        return []
+    
+    added_molecules = [
+        {
+            "id": molecule_id,
+            "name": name,
+            "category": category,
+            "applications": list(applications),
+            "rwanda_relevance": rwanda_relevance
+        }
+        for molecule_id, (name, _, category, _, applications, rwanda_relevance)
+        in zip(molecule_ids, new_rows)
+    ]
+    
+    logger.info("Added %d Rwanda demo molecules", len(added_molecules))
+    if logger.isEnabledFor(logging.DEBUG):
+        for molecule in added_molecules:
+            logger.debug("Added molecule: %s (ID: %s)", molecule["name"], molecule["id"])
     
     return added_molecules
 
-def get_rwanda_agricultural_recommendations(crop_type: str = None, pest_issue: str = None, 
-                                          nutrient_deficiency: str = None) -> List[Dict]:
-    """Get molecule recommendations based on Rwanda agricultural needs"""
+# Recommendation entries, built once at import and shared read-only by every call
+_REC_UREA_MAIZE = MappingProxyType({"molecule": "Urea", "reason": "Nitrogen fertilizer for maize growth"})
+_REC_NEEM_MAIZE = MappingProxyType({"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Fall armyworm control in maize"})
+_REC_CAFFEINE_COFFEE = MappingProxyType({"molecule": "Caffeine", "reason": "Quality assessment and enhancement"})
+_REC_PYRETHRIN_COFFEE = MappingProxyType({"molecule": "Pyrethrin I", "reason": "Coffee berry borer control"})
+_REC_KCL_COFFEE = MappingProxyType({"molecule": "Potassium Chloride (Muriate of Potash)", "reason": "Coffee quality improvement"})
+_REC_IRON_BEANS = MappingProxyType({"molecule": "Iron-EDTA Chelate", "reason": "Iron deficiency treatment in beans"})
+_REC_NEEM_BEANS = MappingProxyType({"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Bean stem maggot control"})
+_REC_KCL_TEA = MappingProxyType({"molecule": "Potassium Chloride (Muriate of Potash)", "reason": "Tea quality enhancement"})
+_REC_NEEM_FAW = MappingProxyType({"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Natural fall armyworm control"})
+_REC_PYRETHRIN_CBB = MappingProxyType({"molecule": "Pyrethrin I", "reason": "Organic coffee berry borer control"})
+_REC_NEEM_BSM = MappingProxyType({"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Bean stem maggot management"})
+_REC_UREA_NITROGEN = MappingProxyType({"molecule": "Urea", "reason": "Primary nitrogen source"})
+_REC_IRON_IRON = MappingProxyType({"molecule": "Iron-EDTA Chelate", "reason": "Bioavailable iron supplementation"})
+_REC_KCL_POTASSIUM = MappingProxyType({"molecule": "Potassium Chloride (Muriate of Potash)", "reason": "Potassium supplementation"})
+
+# Recommendation lookup tables.
+# Crop keys are lowercased canonical names; pest and nutrient tables are
+# ordered (keyword, recommendation) pairs where the first keyword found wins.
+_CROP_RECOMMENDATIONS = {
+    "maize": (_REC_UREA_MAIZE, _REC_NEEM_MAIZE),
+    "corn": (_REC_UREA_MAIZE, _REC_NEEM_MAIZE),
+    "coffee": (_REC_CAFFEINE_COFFEE, _REC_PYRETHRIN_COFFEE, _REC_KCL_COFFEE),
+    "beans": (_REC_IRON_BEANS, _REC_NEEM_BEANS),
+    "legumes": (_REC_IRON_BEANS, _REC_NEEM_BEANS),
+    "tea": (_REC_KCL_TEA,),
+}
+
+_PEST_RECOMMENDATIONS = (
+    ("fall_armyworm", _REC_NEEM_FAW),
+    ("coffee_berry_borer", _REC_PYRETHRIN_CBB),
+    ("bean_stem_maggot", _REC_NEEM_BSM),
+)
+
+_NUTRIENT_RECOMMENDATIONS = (
+    ("nitrogen", _REC_UREA_NITROGEN),
+    ("iron", _REC_IRON_IRON),
+    ("potassium", _REC_KCL_POTASSIUM),
+)
+
+def _compile_keyword_table(table) -> Tuple[re.Pattern, Tuple[Mapping[str, str], ...]]:
+    """Compile an ordered (keyword, recommendation) table into a single regex scan
+    
+    Each keyword gets its own capture group, so the group index gives its
+    priority without lowercasing the match. The lookahead reports every
+    position where a keyword starts, including overlapping ones, so table
+    order can still decide which keyword wins.
+    """
+    alternation = "|".join(f"({re.escape(keyword)})" for keyword, _ in table)
+    pattern = re.compile(f"(?=(?:{alternation}))", re.IGNORECASE)
+    return pattern, tuple(rec for _, rec in table)
+
+_PEST_MATCHER = _compile_keyword_table(_PEST_RECOMMENDATIONS)
+_NUTRIENT_MATCHER = _compile_keyword_table(_NUTRIENT_RECOMMENDATIONS)
+
+def _first_keyword_match(text: str, matcher) -> Optional[Mapping[str, str]]:
+    """Return the recommendation for the highest-priority keyword found in text"""
+    pattern, recommendations = matcher
+    best = None
+    for match in pattern.finditer(text):
+        priority = match.lastindex - 1
+        if best is None or priority < best:
+            best = priority
+            if priority == 0:
+                break
+    return recommendations[best] if best is not None else None
+
+@lru_cache(maxsize=256)
+def _cached_recommendations(crop_type: Optional[str], pest_issue: Optional[str],
+                            nutrient_deficiency: Optional[str]) -> Tuple[Mapping[str, str], ...]:
+    """Build recommendations for a lowercased crop type (memoized)"""
     recommendations = []
     
     # Crop-specific recommendations
     if crop_type:
-        if crop_type.lower() in ["maize", "corn"]:
-            recommendations.extend([
-                {"molecule": "Urea", "reason": "Nitrogen fertilizer for maize growth"},
-                {"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Fall armyworm control in maize"}
-            ])
-        elif crop_type.lower() == "coffee":
-            recommendations.extend([
-                {"molecule": "Caffeine", "reason": "Quality assessment and enhancement"},
-                {"molecule": "Pyrethrin I", "reason": "Coffee berry borer control"},
-                {"molecule": "Potassium Chloride (Muriate of Potash)", "reason": "Coffee quality improvement"}
-            ])
-        elif crop_type.lower() in ["beans", "legumes"]:
-            recommendations.extend([
-                {"molecule": "Iron-EDTA Chelate", "reason": "Iron deficiency treatment in beans"},
-                {"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Bean stem maggot control"}
-            ])
-        elif crop_type.lower() == "tea":
-            recommendations.extend([
-                {"molecule": "Potassium Chloride (Muriate of Potash)", "reason": "Tea quality enhancement"}
-            ])
+        recommendations.extend(_CROP_RECOMMENDATIONS.get(crop_type, ()))
     
     # Pest-specific recommendations
     if pest_issue:
-        if "fall_armyworm" in pest_issue.lower():
-            recommendations.append({"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Natural fall armyworm control"})
-        elif "coffee_berry_borer" in pest_issue.lower():
-            recommendations.append({"molecule": "Pyrethrin I", "reason": "Organic coffee berry borer control"})
-        elif "bean_stem_maggot" in pest_issue.lower():
-            recommendations.append({"molecule": "Azadirachtin (Neem Oil Active)", "reason": "Bean stem maggot management"})
+        rec = _first_keyword_match(pest_issue, _PEST_MATCHER)
+        if rec:
+            recommendations.append(rec)
     
     # Nutrient deficiency recommendations
     if nutrient_deficiency:
-        if "nitrogen" in nutrient_deficiency.lower():
-            recommendations.append({"molecule": "Urea", "reason": "Primary nitrogen source"})
-        elif "iron" in nutrient_deficiency.lower():
-            recommendations.append({"molecule": "Iron-EDTA Chelate", "reason": "Bioavailable iron supplementation"})
-        elif "potassium" in nutrient_deficiency.lower():
-            recommendations.append({"molecule": "Potassium Chloride (Muriate of Potash)", "reason": "Potassium supplementation"})
+        rec = _first_keyword_match(nutrient_deficiency, _NUTRIENT_MATCHER)
+        if rec:
+            recommendations.append(rec)
+    
+    return tuple(recommendations)
+
+def get_rwanda_agricultural_recommendations(crop_type: str = None, pest_issue: str = None, 
+                                          nutrient_deficiency: str = None) -> List[Mapping[str, str]]:
+    """Get molecule recommendations based on Rwanda agricultural needs
     
-    return recommendations
+    The returned list is fresh, but its entries are shared read-only mappings.
+    """
+    # Pest and nutrient matching is case-insensitive, so only the crop key is lowercased
+    cached = _cached_recommendations(
+        crop_type.lower() if crop_type else None,
+        pest_issue or None,
+        nutrient_deficiency or None
+    )
+    # Entries are read-only mappings, so only the list itself needs to be fresh
+    return list(cached)
+
+get_rwanda_agricultural_recommendations.cache_clear = _cached_recommendations.cache_clear
+
+# Description keywords that mark a molecule as Rwanda-relevant
+RWANDA_KEYWORDS = ('rwanda', 'coffee', 'bean', 'maize', 'pest', 'fertilizer')
+
+# Statistics cache, invalidated whenever molecular_db.version changes
+_stats_cache = {"value": None, "version": -1}
+_stats_lock = threading.Lock()
 
 def get_rwanda_molecule_statistics() -> Dict:
     """Get statistics about Rwanda-relevant molecules in the database"""
+    with _stats_lock:
+        if _stats_cache["version"] != molecular_db.version:
+            # Read the version first so a concurrent write forces a later recompute
+            version = molecular_db.version
+            _stats_cache["value"] = _compute_rwanda_molecule_statistics()
+            _stats_cache["version"] = version
+        return copy.deepcopy(_stats_cache["value"])
+
+def _compute_rwanda_molecule_statistics() -> Dict:
+    """Compute Rwanda molecule statistics from the database"""
     stats = {
         "total_rwanda_molecules": 0,
         "by_category": {},
@@ -165,17 +331,13 @@ def get_rwanda_molecule_statistics() -> Dict:
         "molecules_by_crop": {}
     }
     
-    # Search for Rwanda-relevant molecules
-    all_molecules = molecular_db.search_molecules()
-    rwanda_molecules = [m for m in all_molecules if any(keyword in m.get('description', '').lower() 
-                                                      for keyword in ['rwanda', 'coffee', 'bean', 'maize', 'pest', 'fertilizer'])]
+    # Search for Rwanda-relevant molecules (keyword filter runs in SQL)
+    rwanda_molecules = molecular_db.search_molecules(keywords=list(RWANDA_KEYWORDS))
     
     stats["total_rwanda_molecules"] = len(rwanda_molecules)
     
     # Category breakdown
-    for molecule in rwanda_molecules:
-        category = molecule.get('category', 'unknown')
-        stats["by_category"][category] = stats["by_category"].get(category, 0) + 1
+    stats["by_category"] = dict(Counter(m.get('category', 'unknown') for m in rwanda_molecules))
     
     return stats
 
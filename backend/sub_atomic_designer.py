@@ -4,6 +4,11 @@
 
 import numpy as np
 import json
+import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
 import logging
@@ -14,11 +19,153 @@ from simulation_core import (
     molecule_to_string,
     run_molecule_simulation,
     predict_material_properties,
-    calculate_molecular_descriptors
+    PYSCF_AVAILABLE
 )
 
+# Numba JIT for the property kernel (optional - falls back to NumPy)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit so kernels still import without Numba"""
+        def decorator(func):
+            return func
+        return decorator
+
 logger = logging.getLogger(__name__)
 
+# Elements with tabulated atomic properties; the property arrays below and
+# SYMBOL_ID share this order
+ELEMENTS = ('H', 'C', 'N', 'O', 'P', 'S', 'Cl', 'F', 'Si', 'Ca', 'Fe', 'Zn')
+ELEMENT_RADIUS = np.array([0.31, 0.76, 0.71, 0.66, 1.07, 1.05, 0.99, 0.57, 1.11, 1.74, 1.26, 1.22])
+ELEMENT_ELECTRONEGATIVITY = np.array([2.20, 2.55, 3.04, 3.44, 2.19, 2.58, 3.16, 3.98, 1.90, 1.00, 1.83, 1.65])
+ELEMENT_VALENCE = np.array([1, 4, 3, 2, 5, 6, 1, 1, 4, 2, 3, 2], dtype=np.int32)
+ELEMENT_MASS = np.array([1.008, 12.011, 14.007, 15.999, 30.974, 32.065, 35.453, 18.998,
+                         28.085, 40.078, 55.845, 65.38])
+
+# Integer ids for element symbols used by the analysis kernel. Tabulated
+# elements come first so ids index the property arrays directly; symbols not
+# listed here are registered on first sight by _symbol_id.
+SYMBOL_ID = {symbol: i for i, symbol in enumerate(ELEMENTS + ('Br', 'I', 'Pb', 'Hg', 'Cd'))}
+TOXIC_ELEMENTS = ('Cl', 'Br', 'I', 'Pb', 'Hg', 'Cd')
+
+# Maximum number of molecule analyses kept by SubAtomicDesigner
+ANALYSIS_CACHE_SIZE = 4096
+
+# Stop designing after this many iterations without a fitness gain above epsilon
+PLATEAU_PATIENCE = 3
+PLATEAU_EPSILON = 1e-3
+
+_ID_C = SYMBOL_ID['C']
+_ID_N = SYMBOL_ID['N']
+_ID_O = SYMBOL_ID['O']
+_ID_F = SYMBOL_ID['F']
+_ID_SI = SYMBOL_ID['Si']
+_ID_CL = SYMBOL_ID['Cl']
+_ID_BR = SYMBOL_ID['Br']
+_ID_I = SYMBOL_ID['I']
+_ID_PB = SYMBOL_ID['Pb']
+_ID_HG = SYMBOL_ID['Hg']
+_ID_CD = SYMBOL_ID['Cd']
+_TOXIC_IDS = np.array([SYMBOL_ID[symbol] for symbol in TOXIC_ELEMENTS])
+
+def _symbol_id(symbol: str) -> int:
+    """Return the kernel id for an element symbol, registering unknown symbols"""
+    sid = SYMBOL_ID.get(symbol)
+    if sid is None:
+        sid = SYMBOL_ID.setdefault(symbol, len(SYMBOL_ID))
+    return sid
+
+def _symbol_ids(symbols) -> np.ndarray:
+    """Encode element symbols as an int16 id array"""
+    # Look up each distinct symbol once, then scatter ids back by inverse index
+    unique, inverse = np.unique(np.asarray(symbols), return_inverse=True)
+    ids = np.fromiter((_symbol_id(str(symbol)) for symbol in unique), dtype=np.int16,
+                      count=len(unique))
+    return ids[inverse.reshape(-1)]
+
+@njit(cache=True)
+def _properties_from_counts(total_atoms, carbon, oxygen, biodegradable, hydrophobic,
+                            toxic, complexity):
+    """Turn element counts into the eight material property estimates"""
+    # Strength estimation (based on aromatic content and crosslinking)
+    aromatic_ratio = carbon / total_atoms if total_atoms > 0 else 0.0
+    strength = min(1.0, aromatic_ratio * 2 + 0.3)
+    
+    # Flexibility estimation (based on chain length and ester content)
+    chain_length_factor = min(1.0, total_atoms / 20)
+    oxygen_ratio = oxygen / total_atoms if total_atoms > 0 else 0.0
+    flexibility = min(1.0, chain_length_factor * 0.7 + oxygen_ratio * 0.5)
+    
+    # Biodegradability (based on oxygen and nitrogen content)
+    biodegradability = min(1.0, biodegradable / total_atoms * 3)
+    
+    # UV resistance (based on aromatic content and conjugation)
+    uv_resistance = min(1.0, aromatic_ratio * 1.5 + 0.2)
+    
+    # Water resistance (based on hydrophobic content)
+    water_resistance = min(1.0, hydrophobic / total_atoms * 1.2)
+    
+    # Cost effectiveness (inverse of molecular complexity)
+    cost_effectiveness = max(0.1, 1.0 - complexity / 10)
+    
+    # Environmental safety (based on toxic element content)
+    environmental_safety = max(0.1, 1.0 - toxic / total_atoms * 5)
+    
+    # Agricultural suitability (composite score)
+    agricultural_suitability = (
+        biodegradability * 0.4 +
+        environmental_safety * 0.4 +
+        cost_effectiveness * 0.2
+    )
+    
+    return (strength, flexibility, biodegradability, uv_resistance, water_resistance,
+            cost_effectiveness, environmental_safety, agricultural_suitability)
+
+def _analyze_counts(counts: np.ndarray):
+    """Property estimates from a histogram of symbol ids (one bincount pass)"""
+    carbon = int(counts[_ID_C])
+    oxygen = int(counts[_ID_O])
+    return _properties_from_counts(
+        int(counts.sum()), carbon, oxygen, oxygen + int(counts[_ID_N]),
+        carbon + int(counts[_ID_SI]) + int(counts[_ID_F]),
+        int(counts[_TOXIC_IDS].sum()), int(np.count_nonzero(counts))
+    )
+
+@njit(cache=True)
+def _analyze_kernel(sym_ids, n_symbols):
+    """Single pass over symbol ids accumulating every count the estimates need"""
+    seen = np.zeros(n_symbols, dtype=np.bool_)
+    carbon = 0
+    oxygen = 0
+    nitrogen = 0
+    hydrophobic = 0
+    toxic = 0
+    complexity = 0
+    
+    for sid in sym_ids:
+        if not seen[sid]:
+            seen[sid] = True
+            complexity += 1
+        if sid == _ID_C:
+            carbon += 1
+            hydrophobic += 1
+        elif sid == _ID_O:
+            oxygen += 1
+        elif sid == _ID_N:
+            nitrogen += 1
+        elif sid == _ID_SI or sid == _ID_F:
+            hydrophobic += 1
+        elif (sid == _ID_CL or sid == _ID_BR or sid == _ID_I or
+              sid == _ID_PB or sid == _ID_HG or sid == _ID_CD):
+            toxic += 1
+    
+    return _properties_from_counts(len(sym_ids), carbon, oxygen, oxygen + nitrogen,
+                                   hydrophobic, toxic, complexity)
+
 @dataclass
 class AtomicModification:
     """Represents an atomic-level modification"""
@@ -27,7 +174,7 @@ class AtomicModification:
     parameters: Dict[str, Any]
     expected_effect: str
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MaterialTarget:
     """Target properties for material design"""
     strength: float = 0.5  # 0-1 scale
@@ -39,29 +186,236 @@ class MaterialTarget:
     environmental_safety: float = 0.8
     agricultural_suitability: float = 0.7
 
+# Property order shared by MaterialTarget, the analysis kernel and fitness scoring
+PROPERTY_NAMES = (
+    'strength', 'flexibility', 'biodegradability', 'uv_resistance',
+    'water_resistance', 'cost_effectiveness', 'environmental_safety',
+    'agricultural_suitability'
+)
+
+# Capitalized names for recommendation messages
+_CAPITALIZED_PROPERTY_NAMES = tuple(prop.capitalize() for prop in PROPERTY_NAMES)
+
+def target_to_vec(target: MaterialTarget) -> np.ndarray:
+    """Target property values as a float array in PROPERTY_NAMES order"""
+    return np.array([getattr(target, prop) for prop in PROPERTY_NAMES], float)
+
+def _fold_atom_hash(h: int, symbols: np.ndarray, coords: np.ndarray) -> int:
+    """Fold atoms into a running hash in order (repeated atoms do not cancel)"""
+    for symbol, (x, y, z) in zip(symbols.tolist(), coords.tolist()):
+        h = hash((h, symbol, x, y, z))
+    return h
+
+class AtomArray:
+    """Structure-of-arrays view of a molecule used inside the designer
+    
+    Atoms live in over-allocated buffers that double when full, so appending
+    is amortized O(1). The public arrays are views of the first n rows.
+    A content hash is folded forward as atoms are appended, so it never
+    needs to rescan the whole molecule.
+    """
+    
+    def __init__(self, symbols: np.ndarray, coords: np.ndarray, sym_ids: np.ndarray,
+                 capacity: int = None):
+        n = len(symbols)
+        capacity = max(n, capacity or 0)
+        self._n = n
+        self._symbols = np.empty(capacity, dtype=symbols.dtype)
+        self._coords = np.empty((capacity, 3), dtype=np.float64)
+        self._sym_ids = np.empty(capacity, dtype=np.int16)
+        self._symbols[:n] = symbols
+        self._coords[:n] = coords
+        self._sym_ids[:n] = sym_ids
+        self._hash = _fold_atom_hash(0, symbols, coords)
+    
+    @property
+    def symbols(self) -> np.ndarray:
+        """(n,) element symbols"""
+        return self._symbols[:self._n]
+    
+    @property
+    def coords(self) -> np.ndarray:
+        """(n, 3) float64 positions"""
+        return self._coords[:self._n]
+    
+    @property
+    def sym_ids(self) -> np.ndarray:
+        """(n,) int16 SYMBOL_ID codes for the analysis kernel"""
+        return self._sym_ids[:self._n]
+    
+    @property
+    def ids(self) -> np.ndarray:
+        """(n,) int32 atom ids (atoms are numbered by position)"""
+        return np.arange(self._n, dtype=np.int32)
+    
+    @property
+    def content_hash(self) -> Tuple[int, int]:
+        """(atom count, hash of symbols and coordinates) identifying the structure"""
+        return self._n, self._hash
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    def append(self, symbols: np.ndarray, sym_ids: np.ndarray, coords: np.ndarray):
+        """Append k atoms in place, growing the buffers if needed"""
+        n, k = self._n, len(symbols)
+        if n + k > len(self._sym_ids) or symbols.dtype.itemsize > self._symbols.dtype.itemsize:
+            self._grow(max(n + k, 2 * len(self._sym_ids)), np.promote_types(self._symbols.dtype, symbols.dtype))
+        self._symbols[n:n + k] = symbols
+        self._sym_ids[n:n + k] = sym_ids
+        self._coords[n:n + k] = coords
+        self._n = n + k
+        self._hash = _fold_atom_hash(self._hash, symbols, coords)
+    
+    def _grow(self, capacity: int, symbol_dtype):
+        n = self._n
+        symbols, coords, sym_ids = self._symbols, self._coords, self._sym_ids
+        self._symbols = np.empty(capacity, dtype=symbol_dtype)
+        self._coords = np.empty((capacity, 3), dtype=np.float64)
+        self._sym_ids = np.empty(capacity, dtype=np.int16)
+        self._symbols[:n] = symbols[:n]
+        self._coords[:n] = coords[:n]
+        self._sym_ids[:n] = sym_ids[:n]
+
+def _to_soa(atom_data: List[Dict[str, Any]]) -> AtomArray:
+    """Convert parse_molecule_string output to an AtomArray"""
+    symbols = np.array([atom['symbol'] for atom in atom_data])
+    return AtomArray(
+        symbols=symbols,
+        coords=np.array([[atom['x'], atom['y'], atom['z']] for atom in atom_data], dtype=np.float64),
+        sym_ids=_symbol_ids(symbols),
+        # Leave room for the handful of atoms each design iteration adds
+        capacity=2 * len(atom_data)
+    )
+
+def _from_soa(soa: AtomArray) -> List[Dict[str, Any]]:
+    """Convert an AtomArray back to the atom dicts used by simulation_core"""
+    return [
+        {'symbol': str(symbol), 'x': float(x), 'y': float(y), 'z': float(z), 'atom_id': int(atom_id)}
+        for symbol, (x, y, z), atom_id in zip(soa.symbols, soa.coords, soa.ids)
+    ]
+
+# Functional-group templates: symbols, kernel ids, and offsets from the anchor atom
+_HYDROXYL_SYMBOLS = np.array(['O', 'H'])
+_HYDROXYL_SYM_IDS = _symbol_ids(_HYDROXYL_SYMBOLS)
+_HYDROXYL_OFFSETS = np.array([[1.4, 0.0, 0.0],    # oxygen
+                              [2.4, 0.0, 0.0]])   # hydrogen
+
+_CARBOXYL_SYMBOLS = np.array(['C', 'O', 'O', 'H'])
+_CARBOXYL_SYM_IDS = _symbol_ids(_CARBOXYL_SYMBOLS)
+_CARBOXYL_OFFSETS = np.array([[1.5, 0.0, 0.0],    # carbon
+                              [1.5, 1.2, 0.0],    # double-bonded oxygen
+                              [2.9, 0.0, 0.0],    # OH oxygen
+                              [3.9, 0.0, 0.0]])   # OH hydrogen
+
+_CHAIN_SYMBOLS = np.array(['C', 'H', 'H'])
+_CHAIN_SYM_IDS = _symbol_ids(_CHAIN_SYMBOLS)
+_CHAIN_OFFSETS = np.array([[1.5, 0.0, 0.0],       # carbon
+                           [1.5, -1.1, 1.1],      # hydrogens
+                           [1.5, 1.1, 1.1]])
+
+_ESTER_SYMBOLS = np.array(['C', 'O', 'O'])
+_ESTER_SYM_IDS = _symbol_ids(_ESTER_SYMBOLS)
+_ESTER_OFFSETS = np.array([[1.5, 0.0, 0.0],       # carbon
+                           [1.5, 1.2, 0.0],       # double-bonded oxygen
+                           [2.9, 0.0, 0.0]])      # single-bonded oxygen
+
+def _group_adder(symbols: np.ndarray, sym_ids: np.ndarray, offsets: np.ndarray,
+                 carbon_only: bool = False, at_end: bool = False):
+    """Build an appender that attaches a fixed functional group to an anchor atom
+    
+    The anchor is the target atom (only if it is carbon when carbon_only is set)
+    or, with at_end, the last atom regardless of target.
+    """
+    if at_end:
+        def add(soa: AtomArray, target_atom: int):
+            if len(soa):
+                soa.append(symbols, sym_ids, soa.coords[-1] + offsets)
+    elif carbon_only:
+        def add(soa: AtomArray, target_atom: int):
+            if target_atom < len(soa) and soa.sym_ids[target_atom] == _ID_C:
+                soa.append(symbols, sym_ids, soa.coords[target_atom] + offsets)
+    else:
+        def add(soa: AtomArray, target_atom: int):
+            if target_atom < len(soa):
+                soa.append(symbols, sym_ids, soa.coords[target_atom] + offsets)
+    return add
+
+# Modification rules: (property, type, improvement threshold, improvement scale,
+# target selector, description). Selectors get the atom count and carbon indices
+# and return the target atom, or None when the rule does not apply.
+_MOD_RULES = (
+    ('strength', 'add_aromatic_ring', 0.2, 0.6,
+     lambda n, carbons: carbons[0] if carbons else None,
+     'Add aromatic ring to increase strength'),
+    ('strength', 'add_amide_group', 0.1, 0.4,
+     lambda n, carbons: n // 2 if n > 3 else None,
+     'Add amide group for stronger intermolecular forces'),
+    ('flexibility', 'add_ester_linkage', 0.15, 0.5,
+     lambda n, carbons: n // 3,
+     'Add ester linkage for increased flexibility'),
+    ('flexibility', 'extend_chain', 0.1, 0.3,
+     lambda n, carbons: -1,  # Add to end
+     'Extend molecular chain for flexibility'),
+    ('biodegradability', 'add_hydroxyl_group', 0.1, 0.7,
+     lambda n, carbons: carbons[len(carbons) // 2] if carbons else None,
+     'Add hydroxyl group for biodegradability'),
+    ('biodegradability', 'add_carboxyl_group', 0.2, 0.8,
+     lambda n, carbons: n - 1,
+     'Add carboxyl group for enhanced biodegradation'),
+    ('uv_resistance', 'add_uv_stabilizer', 0.15, 0.6,
+     lambda n, carbons: 0,
+     'Add UV-stabilizing aromatic system'),
+    ('water_resistance', 'add_hydrophobic_group', 0.1, 0.5,
+     lambda n, carbons: n // 2,
+     'Add hydrophobic groups for water resistance'),
+)
+
 class SubAtomicDesigner:
     """Advanced sub-atomic level material designer for agricultural applications"""
     
     def __init__(self):
-        self.atomic_properties = self._load_atomic_properties()
+        self._load_atomic_properties()
         self.functional_groups = self._load_functional_groups()
         self.design_rules = self._load_design_rules()
+        
+        # Fitness weights in PROPERTY_NAMES order; environmental properties weigh
+        # more and environmental safety the most
+        self._prop_order = PROPERTY_NAMES
+        self._weights = np.array([1.0, 1.0, 1.2, 0.8, 0.8, 1.1, 1.3, 1.2])
+        self._wsum = self._weights.sum()
+        
+        # Analysis results keyed by AtomArray.content_hash, shared across designs
+        self._analysis_cache: Dict[Tuple[int, int], Dict[str, float]] = {}
+        
+        # Appenders specialized to each supported modification's template;
+        # other modification types leave the molecule unchanged
+        self._mod_dispatch = {
+            'add_hydroxyl_group': _group_adder(_HYDROXYL_SYMBOLS, _HYDROXYL_SYM_IDS,
+                                               _HYDROXYL_OFFSETS, carbon_only=True),
+            'add_carboxyl_group': _group_adder(_CARBOXYL_SYMBOLS, _CARBOXYL_SYM_IDS, _CARBOXYL_OFFSETS),
+            'extend_chain': _group_adder(_CHAIN_SYMBOLS, _CHAIN_SYM_IDS, _CHAIN_OFFSETS, at_end=True),
+            'add_ester_linkage': _group_adder(_ESTER_SYMBOLS, _ESTER_SYM_IDS, _ESTER_OFFSETS),
+        }
+    
+    def _load_atomic_properties(self):
+        """Load atomic property arrays, indexed by SYMBOL_ID"""
+        self._radius = ELEMENT_RADIUS
+        self._en = ELEMENT_ELECTRONEGATIVITY
+        self._valence = ELEMENT_VALENCE
+        self._mass = ELEMENT_MASS
     
-    def _load_atomic_properties(self) -> Dict[str, Dict]:
-        """Load atomic properties database"""
+    @property
+    def atomic_properties(self) -> Dict[str, Dict]:
+        """Atomic properties database as a per-element dict (rebuilt on access)"""
         return {
-            'H': {'radius': 0.31, 'electronegativity': 2.20, 'valence': 1, 'mass': 1.008},
-            'C': {'radius': 0.76, 'electronegativity': 2.55, 'valence': 4, 'mass': 12.011},
-            'N': {'radius': 0.71, 'electronegativity': 3.04, 'valence': 3, 'mass': 14.007},
-            'O': {'radius': 0.66, 'electronegativity': 3.44, 'valence': 2, 'mass': 15.999},
-            'P': {'radius': 1.07, 'electronegativity': 2.19, 'valence': 5, 'mass': 30.974},
-            'S': {'radius': 1.05, 'electronegativity': 2.58, 'valence': 6, 'mass': 32.065},
-            'Cl': {'radius': 0.99, 'electronegativity': 3.16, 'valence': 1, 'mass': 35.453},
-            'F': {'radius': 0.57, 'electronegativity': 3.98, 'valence': 1, 'mass': 18.998},
-            'Si': {'radius': 1.11, 'electronegativity': 1.90, 'valence': 4, 'mass': 28.085},
-            'Ca': {'radius': 1.74, 'electronegativity': 1.00, 'valence': 2, 'mass': 40.078},
-            'Fe': {'radius': 1.26, 'electronegativity': 1.83, 'valence': 3, 'mass': 55.845},
-            'Zn': {'radius': 1.22, 'electronegativity': 1.65, 'valence': 2, 'mass': 65.38}
+            symbol: {
+                'radius': float(self._radius[i]),
+                'electronegativity': float(self._en[i]),
+                'valence': int(self._valence[i]),
+                'mass': float(self._mass[i])
+            }
+            for i, symbol in enumerate(ELEMENTS)
         }
     
     def _load_functional_groups(self) -> Dict[str, Dict]:
@@ -149,30 +503,49 @@ class SubAtomicDesigner:
         design_history = []
         best_score = 0
         best_molecule = current_molecule
+        best_analysis = None
+        stale = 0
+        
+        # Target vector is loop-invariant; build it once in property order
+        target_vec = target_to_vec(target)
+        
+        # Parse once; the arrays are modified in place across iterations and
+        # only serialized for the design history
+        current_soa = _to_soa(parse_molecule_string(current_molecule))
         
         for iteration in range(max_iterations):
             logger.info(f"Design iteration {iteration + 1}/{max_iterations}")
             
             # Analyze current molecule
-            analysis = self._analyze_molecule_properties(current_molecule)
+            analysis = self._analyze_cached(current_soa)
+            current_vec = np.array([analysis[prop] for prop in self._prop_order], float)
             
             # Calculate fitness score
-            fitness_score = self._calculate_fitness(analysis, target)
+            fitness_score = self._calculate_fitness(current_vec, target_vec)
+            
+            stale = 0 if fitness_score > best_score + PLATEAU_EPSILON else stale + 1
             
             if fitness_score > best_score:
                 best_score = fitness_score
                 best_molecule = current_molecule
+                best_analysis = analysis
+            
+            if stale >= PLATEAU_PATIENCE:
+                logger.info(f"Fitness plateaued for {stale} iterations, stopping early")
+                break
             
             # Generate modifications
-            modifications = self._generate_modifications(current_molecule, analysis, target)
+            modifications, improvements = self._generate_modifications(current_soa, current_vec, target_vec)
             
             if not modifications:
                 logger.info("No more beneficial modifications found")
                 break
             
             # Apply best modification
-            best_modification = max(modifications, key=lambda m: m['expected_improvement'])
-            current_molecule = self._apply_modification(current_molecule, best_modification)
+            best_modification = modifications[int(improvements.argmax())]
+            current_molecule = molecule_to_string(
+                _from_soa(self._apply_modification(current_soa, best_modification))
+            )
             
             design_history.append({
                 'iteration': iteration + 1,
@@ -182,7 +555,11 @@ class SubAtomicDesigner:
             })
         
         # Final analysis and simulation
-        final_analysis = self._analyze_molecule_properties(best_molecule)
+        # The best molecule was analyzed when it was scored; only re-parse if
+        # no iteration ran
+        if best_analysis is None:
+            best_analysis = self._analyze_cached(_to_soa(parse_molecule_string(best_molecule)))
+        final_analysis = best_analysis
         simulation_result = run_molecule_simulation(best_molecule, method="hf")
         material_properties = predict_material_properties(best_molecule, num_repeats=3)
         
@@ -190,368 +567,109 @@ class SubAtomicDesigner:
             'success': True,
             'original_molecule': base_molecule_string,
             'designed_molecule': best_molecule,
-            'target_properties': target.__dict__,
+            'target_properties': {prop: getattr(target, prop) for prop in PROPERTY_NAMES},
             'achieved_properties': final_analysis,
             'fitness_score': best_score,
             'design_iterations': len(design_history),
             'design_history': design_history,
             'simulation_result': simulation_result,
             'material_properties': material_properties,
-            'design_recommendations': self._generate_recommendations(final_analysis, target)
+            'design_recommendations': self._generate_recommendations(final_analysis, target_vec)
         }
     
-    def _analyze_molecule_properties(self, molecule_string: str) -> Dict[str, float]:
+    def _analyze_cached(self, soa: AtomArray) -> Dict[str, float]:
+        """Analyze a molecule, reusing the result for structures seen before"""
+        key = soa.content_hash
+        properties = self._analysis_cache.get(key)
+        if properties is None:
+            properties = self._analyze_molecule_properties(soa)
+            if len(self._analysis_cache) >= ANALYSIS_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                del self._analysis_cache[next(iter(self._analysis_cache))]
+            self._analysis_cache[key] = properties
+        return dict(properties)
+    
+    def _analyze_molecule_properties(self, soa: AtomArray) -> Dict[str, float]:
         """Analyze molecular properties relevant to material design"""
         try:
-            atom_data = parse_molecule_string(molecule_string)
-            descriptors = calculate_molecular_descriptors(atom_data)
-            
-            # Calculate property estimates based on molecular structure
-            properties = {}
-            
-            # Strength estimation (based on aromatic content and crosslinking)
-            aromatic_atoms = sum(1 for atom in atom_data if atom['symbol'] == 'C')
-            total_atoms = len(atom_data)
-            aromatic_ratio = aromatic_atoms / total_atoms if total_atoms > 0 else 0
-            properties['strength'] = min(1.0, aromatic_ratio * 2 + 0.3)
-            
-            # Flexibility estimation (based on chain length and ester content)
-            chain_length_factor = min(1.0, total_atoms / 20)
-            oxygen_ratio = sum(1 for atom in atom_data if atom['symbol'] == 'O') / total_atoms if total_atoms > 0 else 0
-            properties['flexibility'] = min(1.0, chain_length_factor * 0.7 + oxygen_ratio * 0.5)
-            
-            # Biodegradability (based on oxygen and nitrogen content)
-            biodegradable_atoms = sum(1 for atom in atom_data if atom['symbol'] in ['O', 'N'])
-            properties['biodegradability'] = min(1.0, biodegradable_atoms / total_atoms * 3)
-            
-            # UV resistance (based on aromatic content and conjugation)
-            properties['uv_resistance'] = min(1.0, aromatic_ratio * 1.5 + 0.2)
-            
-            # Water resistance (based on hydrophobic content)
-            hydrophobic_atoms = sum(1 for atom in atom_data if atom['symbol'] in ['C', 'Si', 'F'])
-            properties['water_resistance'] = min(1.0, hydrophobic_atoms / total_atoms * 1.2)
+            # One pass over the symbol ids: the JIT kernel, or without Numba a
+            # single bincount giving every element count at once
+            if NUMBA_AVAILABLE:
+                values = _analyze_kernel(soa.sym_ids, len(SYMBOL_ID))
+            else:
+                values = _analyze_counts(np.bincount(soa.sym_ids, minlength=len(SYMBOL_ID)))
             
-            # Cost effectiveness (inverse of molecular complexity)
-            complexity = len(set(atom['symbol'] for atom in atom_data))
-            properties['cost_effectiveness'] = max(0.1, 1.0 - complexity / 10)
-            
-            # Environmental safety (based on toxic element content)
-            toxic_elements = ['Cl', 'Br', 'I', 'Pb', 'Hg', 'Cd']
-            toxic_count = sum(1 for atom in atom_data if atom['symbol'] in toxic_elements)
-            properties['environmental_safety'] = max(0.1, 1.0 - toxic_count / total_atoms * 5)
-            
-            # Agricultural suitability (composite score)
-            properties['agricultural_suitability'] = (
-                properties['biodegradability'] * 0.4 +
-                properties['environmental_safety'] * 0.4 +
-                properties['cost_effectiveness'] * 0.2
-            )
-            
-            return properties
+            return dict(zip(PROPERTY_NAMES, values))
             
         except Exception as e:
             logger.error(f"Error analyzing molecule properties: {e}")
-            return {prop: 0.5 for prop in ['strength', 'flexibility', 'biodegradability', 
-                                         'uv_resistance', 'water_resistance', 'cost_effectiveness',
-                                         'environmental_safety', 'agricultural_suitability']}
+            return {prop: 0.5 for prop in PROPERTY_NAMES}
     
-    def _calculate_fitness(self, current_properties: Dict[str, float], 
-                          target: MaterialTarget) -> float:
+    def _calculate_fitness(self, current_vec: np.ndarray, target_vec: np.ndarray) -> float:
         """Calculate fitness score based on how well current properties match target"""
-        target_dict = target.__dict__
-        
-        total_score = 0
-        weights = {
-            'strength': 1.0,
-            'flexibility': 1.0,
-            'biodegradability': 1.2,  # Higher weight for environmental properties
-            'uv_resistance': 0.8,
-            'water_resistance': 0.8,
-            'cost_effectiveness': 1.1,
-            'environmental_safety': 1.3,  # Highest weight for safety
-            'agricultural_suitability': 1.2
-        }
-        
-        total_weight = 0
-        for prop, target_value in target_dict.items():
-            if prop in current_properties:
-                current_value = current_properties[prop]
-                # Calculate score (1.0 for perfect match, decreasing with distance)
-                score = 1.0 - abs(target_value - current_value)
-                weight = weights.get(prop, 1.0)
-                total_score += score * weight
-                total_weight += weight
-        
-        return total_score / total_weight if total_weight > 0 else 0
+        # Score is 1.0 for a perfect match, decreasing with distance
+        scores = 1.0 - np.abs(target_vec - current_vec)
+        return float(scores @ self._weights / self._wsum)
     
-    def _generate_modifications(self, molecule_string: str, current_properties: Dict[str, float],
-                              target: MaterialTarget) -> List[Dict[str, Any]]:
-        """Generate possible atomic-level modifications"""
+    def _generate_modifications(self, soa: AtomArray, current_vec: np.ndarray,
+                              target_vec: np.ndarray) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Generate possible atomic-level modifications and their expected improvements"""
         modifications = []
-        atom_data = parse_molecule_string(molecule_string)
-        
-        # Identify properties that need improvement
-        target_dict = target.__dict__
-        improvements_needed = {}
+        expected = []
         
-        for prop, target_value in target_dict.items():
-            if prop in current_properties:
-                current_value = current_properties[prop]
-                if target_value > current_value + 0.1:  # Significant improvement needed
-                    improvements_needed[prop] = target_value - current_value
+        # Identify properties that need improvement (significant gap to target)
+        needed = np.flatnonzero(target_vec > current_vec + 0.1)
+        improvements_needed = {
+            self._prop_order[k]: float(target_vec[k] - current_vec[k]) for k in needed
+        }
         
         # Generate modifications based on needed improvements
+        n = len(soa)
+        carbons = np.flatnonzero(soa.sym_ids == _ID_C).tolist()
         for prop, improvement in improvements_needed.items():
-            if prop == 'strength':
-                modifications.extend(self._generate_strength_modifications(atom_data, improvement))
-            elif prop == 'flexibility':
-                modifications.extend(self._generate_flexibility_modifications(atom_data, improvement))
-            elif prop == 'biodegradability':
-                modifications.extend(self._generate_biodegradability_modifications(atom_data, improvement))
-            elif prop == 'uv_resistance':
-                modifications.extend(self._generate_uv_resistance_modifications(atom_data, improvement))
-            elif prop == 'water_resistance':
-                modifications.extend(self._generate_water_resistance_modifications(atom_data, improvement))
-        
-        return modifications
-    
-    def _generate_strength_modifications(self, atom_data: List[Dict], improvement: float) -> List[Dict]:
-        """Generate modifications to increase material strength"""
-        modifications = []
-        
-        # Add aromatic rings
-        carbon_atoms = [i for i, atom in enumerate(atom_data) if atom['symbol'] == 'C']
-        if carbon_atoms and improvement > 0.2:
-            modifications.append({
-                'type': 'add_aromatic_ring',
-                'target_atom': carbon_atoms[0],
-                'expected_improvement': improvement * 0.6,
-                'description': 'Add aromatic ring to increase strength'
-            })
-        
-        # Add amide groups
-        if len(atom_data) > 3 and improvement > 0.1:
-            modifications.append({
-                'type': 'add_amide_group',
-                'target_atom': len(atom_data) // 2,
-                'expected_improvement': improvement * 0.4,
-                'description': 'Add amide group for stronger intermolecular forces'
-            })
-        
-        return modifications
-    
-    def _generate_flexibility_modifications(self, atom_data: List[Dict], improvement: float) -> List[Dict]:
-        """Generate modifications to increase flexibility"""
-        modifications = []
-        
-        # Add ester linkages
-        if improvement > 0.15:
-            modifications.append({
-                'type': 'add_ester_linkage',
-                'target_atom': len(atom_data) // 3,
-                'expected_improvement': improvement * 0.5,
-                'description': 'Add ester linkage for increased flexibility'
-            })
-        
-        # Extend chain length
-        if improvement > 0.1:
-            modifications.append({
-                'type': 'extend_chain',
-                'target_atom': -1,  # Add to end
-                'expected_improvement': improvement * 0.3,
-                'description': 'Extend molecular chain for flexibility'
-            })
-        
-        return modifications
-    
-    def _generate_biodegradability_modifications(self, atom_data: List[Dict], improvement: float) -> List[Dict]:
-        """Generate modifications to increase biodegradability"""
-        modifications = []
-        
-        # Add hydroxyl groups
-        carbon_atoms = [i for i, atom in enumerate(atom_data) if atom['symbol'] == 'C']
-        if carbon_atoms and improvement > 0.1:
-            modifications.append({
-                'type': 'add_hydroxyl_group',
-                'target_atom': carbon_atoms[len(carbon_atoms)//2],
-                'expected_improvement': improvement * 0.7,
-                'description': 'Add hydroxyl group for biodegradability'
-            })
-        
-        # Add carboxyl groups
-        if improvement > 0.2:
-            modifications.append({
-                'type': 'add_carboxyl_group',
-                'target_atom': len(atom_data) - 1,
-                'expected_improvement': improvement * 0.8,
-                'description': 'Add carboxyl group for enhanced biodegradation'
-            })
-        
-        return modifications
-    
-    def _generate_uv_resistance_modifications(self, atom_data: List[Dict], improvement: float) -> List[Dict]:
-        """Generate modifications to increase UV resistance"""
-        modifications = []
-        
-        if improvement > 0.15:
-            modifications.append({
-                'type': 'add_uv_stabilizer',
-                'target_atom': 0,
-                'expected_improvement': improvement * 0.6,
-                'description': 'Add UV-stabilizing aromatic system'
-            })
-        
-        return modifications
-    
-    def _generate_water_resistance_modifications(self, atom_data: List[Dict], improvement: float) -> List[Dict]:
-        """Generate modifications to increase water resistance"""
-        modifications = []
-        
-        if improvement > 0.1:
-            modifications.append({
-                'type': 'add_hydrophobic_group',
-                'target_atom': len(atom_data) // 2,
-                'expected_improvement': improvement * 0.5,
-                'description': 'Add hydrophobic groups for water resistance'
-            })
-        
-        return modifications
-    
-    def _apply_modification(self, molecule_string: str, modification: Dict[str, Any]) -> str:
-        """Apply atomic-level modification to molecule"""
-        atom_data = parse_molecule_string(molecule_string)
-        
-        mod_type = modification['type']
-        target_atom = modification['target_atom']
-        
-        if mod_type == 'add_hydroxyl_group':
-            # Add OH group to target carbon
-            if target_atom < len(atom_data) and atom_data[target_atom]['symbol'] == 'C':
-                base_pos = [atom_data[target_atom]['x'], atom_data[target_atom]['y'], atom_data[target_atom]['z']]
-                # Add oxygen
-                atom_data.append({
-                    'symbol': 'O',
-                    'x': base_pos[0] + 1.4,
-                    'y': base_pos[1],
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-                # Add hydrogen
-                atom_data.append({
-                    'symbol': 'H',
-                    'x': base_pos[0] + 2.4,
-                    'y': base_pos[1],
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-        
-        elif mod_type == 'add_carboxyl_group':
-            # Add COOH group
-            if target_atom < len(atom_data):
-                base_pos = [atom_data[target_atom]['x'], atom_data[target_atom]['y'], atom_data[target_atom]['z']]
-                # Add carbon
-                atom_data.append({
-                    'symbol': 'C',
-                    'x': base_pos[0] + 1.5,
-                    'y': base_pos[1],
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-                # Add double-bonded oxygen
-                atom_data.append({
-                    'symbol': 'O',
-                    'x': base_pos[0] + 1.5,
-                    'y': base_pos[1] + 1.2,
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-                # Add OH group
-                atom_data.append({
-                    'symbol': 'O',
-                    'x': base_pos[0] + 2.9,
-                    'y': base_pos[1],
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-                atom_data.append({
-                    'symbol': 'H',
-                    'x': base_pos[0] + 3.9,
-                    'y': base_pos[1],
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-        
-        elif mod_type == 'extend_chain':
-            # Add carbon to extend chain
-            if atom_data:
-                last_atom = atom_data[-1]
-                atom_data.append({
-                    'symbol': 'C',
-                    'x': last_atom['x'] + 1.5,
-                    'y': last_atom['y'],
-                    'z': last_atom['z'],
-                    'atom_id': len(atom_data)
-                })
-                # Add hydrogens
-                for i in range(2):
-                    atom_data.append({
-                        'symbol': 'H',
-                        'x': last_atom['x'] + 1.5,
-                        'y': last_atom['y'] + (i * 2 - 1) * 1.1,
-                        'z': last_atom['z'] + 1.1,
-                        'atom_id': len(atom_data)
+            for rule_prop, mod_type, threshold, scale, select_target, description in _MOD_RULES:
+                if rule_prop != prop or improvement <= threshold:
+                    continue
+                target_atom = select_target(n, carbons)
+                if target_atom is not None:
+                    expected.append(improvement * scale)
+                    modifications.append({
+                        'type': mod_type,
+                        'target_atom': target_atom,
+                        'expected_improvement': expected[-1],
+                        'description': description
                     })
         
-        elif mod_type == 'add_ester_linkage':
-            # Add ester group (COO)
-            if target_atom < len(atom_data):
-                base_pos = [atom_data[target_atom]['x'], atom_data[target_atom]['y'], atom_data[target_atom]['z']]
-                # Add carbon
-                atom_data.append({
-                    'symbol': 'C',
-                    'x': base_pos[0] + 1.5,
-                    'y': base_pos[1],
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-                # Add double-bonded oxygen
-                atom_data.append({
-                    'symbol': 'O',
-                    'x': base_pos[0] + 1.5,
-                    'y': base_pos[1] + 1.2,
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-                # Add single-bonded oxygen
-                atom_data.append({
-                    'symbol': 'O',
-                    'x': base_pos[0] + 2.9,
-                    'y': base_pos[1],
-                    'z': base_pos[2],
-                    'atom_id': len(atom_data)
-                })
-        
-        return molecule_to_string(atom_data)
+        return modifications, np.array(expected)
+    
+    def _apply_modification(self, soa: AtomArray, modification: Dict[str, Any]) -> AtomArray:
+        """Apply atomic-level modification to molecule (in place; returns soa)"""
+        add = self._mod_dispatch.get(modification['type'])
+        if add is not None:
+            add(soa, modification['target_atom'])
+        return soa
     
     def _generate_recommendations(self, achieved_properties: Dict[str, float], 
-                                target: MaterialTarget) -> List[str]:
+                                target_vec: np.ndarray) -> List[str]:
         """Generate design recommendations based on results"""
         recommendations = []
-        target_dict = target.__dict__
         
-        for prop, target_value in target_dict.items():
-            if prop in achieved_properties:
-                achieved_value = achieved_properties[prop]
-                if target_value > achieved_value + 0.1:
-                    recommendations.append(
-                        f"Consider additional modifications to improve {prop}: "
-                        f"target {target_value:.2f}, achieved {achieved_value:.2f}"
-                    )
-                elif achieved_value > target_value + 0.1:
-                    recommendations.append(
-                        f"{prop.capitalize()} exceeded target: "
-                        f"achieved {achieved_value:.2f} vs target {target_value:.2f}"
-                    )
+        # Only format messages for properties clearly off target
+        achieved_vec = np.array([achieved_properties[prop] for prop in self._prop_order], float)
+        below = target_vec > achieved_vec + 0.1
+        above = achieved_vec > target_vec + 0.1
+        for k in np.flatnonzero(below | above):
+            target_value, achieved_value = target_vec[k], achieved_vec[k]
+            if below[k]:
+                recommendations.append(
+                    f"Consider additional modifications to improve {self._prop_order[k]}: "
+                    f"target {target_value:.2f}, achieved {achieved_value:.2f}"
+                )
+            else:
+                recommendations.append(
+                    f"{_CAPITALIZED_PROPERTY_NAMES[k]} exceeded target: "
+                    f"achieved {achieved_value:.2f} vs target {target_value:.2f}"
+                )
         
         # Add general recommendations
         if achieved_properties.get('environmental_safety', 0) < 0.8:
@@ -575,12 +693,24 @@ class SubAtomicDesigner:
             'designed_materials': []
         }
         
+        # Designs for one base molecule run in a single worker so they share
+        # its analysis cache; different base molecules run in parallel. If the
+        # pool itself fails, finish the rest in-process. Errors raised by a
+        # design propagate either way.
+        results = {}
+        if len(base_molecules) > 1 and (os.cpu_count() or 1) > 1:
+            try:
+                self._design_in_pool(base_molecules, property_targets, results)
+            except BrokenProcessPool as e:
+                logger.warning(f"Parallel library design failed, designing sequentially: {e}")
+        
         for i, base_molecule in enumerate(base_molecules):
-            for j, target in enumerate(property_targets):
-                logger.info(f"Designing material {i+1}-{j+1}: base {i+1}, target {j+1}")
-                
-                design_result = self.design_material(base_molecule, target, max_iterations=5)
-                
+            if i not in results:
+                logger.info(f"Designing materials for base {i+1}")
+                results[i] = _design_targets(self, base_molecule, property_targets, 5)
+        
+        for i in sorted(results):
+            for j, design_result in enumerate(results[i]):
                 if design_result['success']:
                     library['designed_materials'].append({
                         'id': f"material_{i+1}_{j+1}",
@@ -593,6 +723,88 @@ class SubAtomicDesigner:
         library['success_rate'] = len(library['designed_materials']) / (len(base_molecules) * len(property_targets))
         
         return library
+    
+    def _design_in_pool(self, base_molecules: List[str], property_targets: List[MaterialTarget],
+                        results: Dict[int, List[Dict[str, Any]]]):
+        """Design each base molecule's targets in the library pool, storing results by base index
+        
+        Raises BrokenProcessPool if the workers cannot be started or die.
+        """
+        executor = _library_pool()
+        try:
+            futures = {
+                executor.submit(_design_task, base_molecule, property_targets, 5): i
+                for i, base_molecule in enumerate(base_molecules)
+            }
+        except (OSError, BrokenProcessPool) as e:
+            _discard_library_pool(executor)
+            raise BrokenProcessPool(f"could not start worker processes: {e}") from e
+        
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                logger.info(f"Designed materials for base {i+1}")
+        except BrokenProcessPool:
+            _discard_library_pool(executor)
+            raise
+        except BaseException:
+            # Don't start queued designs once one has failed
+            for future in futures:
+                future.cancel()
+            raise
+
+def _design_targets(designer: 'SubAtomicDesigner', base_molecule: str,
+                    property_targets: List[MaterialTarget], max_iterations: int) -> List[Dict[str, Any]]:
+    """Design one base molecule against each target in turn, reusing the designer's cache"""
+    return [designer.design_material(base_molecule, target, max_iterations=max_iterations)
+            for target in property_targets]
+
+def _design_task(base_molecule: str, property_targets: List[MaterialTarget],
+                 max_iterations: int) -> List[Dict[str, Any]]:
+    """Run one base molecule's library designs in a worker process
+    
+    Uses the worker's module-level sub_atomic_designer rather than the
+    calling instance; SubAtomicDesigner takes no configuration, so the two
+    behave identically, but state set on the caller does not carry over.
+    The worker's analysis cache persists across library requests.
+    """
+    return _design_targets(sub_atomic_designer, base_molecule, property_targets, max_iterations)
+
+def _init_design_worker():
+    """Limit a library worker to one BLAS/OpenMP thread so the pool doesn't oversubscribe the CPUs"""
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = '1'
+    if PYSCF_AVAILABLE:
+        from pyscf import lib as pyscf_lib
+        pyscf_lib.num_threads(1)
+
+# Library design pool, created on first use and shared across requests.
+# Workers are spawned rather than forked: forking the server process would
+# copy its threads and an already-initialized OpenMP runtime, which is not
+# fork-safe and can hang PySCF in the child.
+_library_executor: Optional[ProcessPoolExecutor] = None
+_library_executor_lock = threading.Lock()
+
+def _library_pool() -> ProcessPoolExecutor:
+    """Get the shared library design pool, starting it if needed"""
+    global _library_executor
+    with _library_executor_lock:
+        if _library_executor is None:
+            _library_executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_design_worker
+            )
+        return _library_executor
+
+def _discard_library_pool(executor: ProcessPoolExecutor):
+    """Drop a broken pool so the next library request starts a fresh one"""
+    global _library_executor
+    with _library_executor_lock:
+        if _library_executor is executor:
+            _library_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
 
 # Global designer instance
 sub_atomic_designer = SubAtomicDesigner()
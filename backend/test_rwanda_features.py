@@ -2,214 +2,484 @@
 # Rwanda Quantum Agricultural Intelligence Platform
 # Comprehensive testing of new Rwanda demo molecules and features
 
-import requests
+import argparse
+import asyncio
+import io
+import httpx
 import json
+import random
+import sys
 import time
-from typing import Dict, Any
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from typing import Dict, Any, List, Optional
+
+# Token-bucket rate limiting (optional - falls back to the semaphore alone)
+try:
+    from aiolimiter import AsyncLimiter
+    AIOLIMITER_AVAILABLE = True
+except ImportError:
+    AIOLIMITER_AVAILABLE = False
+
+# Fast JSON encoding/decoding (optional - falls back to the json module)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# HTTP/2 support for httpx (optional - needs the h2 package)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # Configuration
 BASE_URL = "http://localhost:8000"
+REQUEST_TIMEOUT = 120.0  # simulations can take a while
+MAX_CONCURRENCY = 8  # in-flight requests allowed against the dev server
+RATE_LIMIT_RPM = 120  # nominal requests per minute allowed upstream
+WARMUP_REQUESTS = 4  # untimed /health calls that open the keep-alive pool
+
+# Retries for transient failures: exponential backoff with jitter, or the
+# server's Retry-After (capped) when it sends one
+MAX_ATTEMPTS = 3
+BACKOFF_INITIAL = 0.2  # seconds
+BACKOFF_MAX = 2.0
+RETRY_AFTER_MAX = 30.0  # seconds
+RETRY_STATUSES = {429, 502, 503, 504}
+# Refusals that are safe to resend for state-changing calls, when they
+# carry Retry-After; a 502/504 may hide a write that is still running
+WRITE_RETRY_STATUSES = {429, 503}
+
+def create_client(h2c: bool = False) -> httpx.AsyncClient:
+    """Async client shared by both suites so probes reuse pooled connections
+    
+    HTTP/2 is offered whenever h2 is installed, letting parallel probes share
+    one multiplexed connection to servers that negotiate it over TLS; plain
+    HTTP/1.1 servers still get keep-alive pooling. With h2c, HTTP/2 is spoken
+    directly over cleartext (prior knowledge) for servers such as hypercorn.
+    """
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=REQUEST_TIMEOUT,
+        http1=not h2c,
+        http2=HTTP2_AVAILABLE or h2c,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    )
+
+# Set by main() for the duration of a run
+CLIENT: Optional[httpx.AsyncClient] = None
+
+# HTTP versions the server actually answered with during the run
+HTTP_VERSIONS = set()
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _json_dumps(data: Any) -> bytes:
+    """Serialize a request body to canonical (sorted-key, compact) JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+def _json_loads(content: bytes) -> Any:
+    """Parse a response body"""
+    return orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+
+# POST endpoints that only query data, so they are safe to resend
+QUERY_POST_ENDPOINTS = {"/rwanda_agricultural_recommendations", "/search_molecules",
+                        "/search_molecules/batch"}
+
+def _is_read_only(endpoint: str, method: str) -> bool:
+    """Whether a call leaves server state unchanged"""
+    return method == "GET" or endpoint in QUERY_POST_ENDPOINTS
+
+# Caps concurrent requests so gathered probes don't overwhelm the server
+SEM = asyncio.Semaphore(MAX_CONCURRENCY)
+
+# Sized ~3% under the nominal limit to absorb clock skew
+LIMITER = AsyncLimiter(RATE_LIMIT_RPM * 0.97, 60) if AIOLIMITER_AVAILABLE else nullcontext()
+
+async def _send(endpoint: str, method: str, body: Optional[bytes] = None) -> httpx.Response:
+    """Send one request through the rate limiter and concurrency cap"""
+    async with LIMITER:
+        async with SEM:
+            if method == "GET":
+                return await CLIENT.get(endpoint)
+            elif method == "POST":
+                if body is None:
+                    return await CLIENT.post(endpoint)
+                return await CLIENT.post(endpoint, content=body, headers=JSON_HEADERS)
+
+def _backoff(attempt: int) -> float:
+    """Jittered exponential delay before retry number attempt + 1"""
+    return min(BACKOFF_MAX, BACKOFF_INITIAL * 2 ** attempt + random.uniform(0, BACKOFF_INITIAL))
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a response, honoring Retry-After up to RETRY_AFTER_MAX"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return min(RETRY_AFTER_MAX, max(0.0, float(retry_after)))
+        except ValueError:  # HTTP-date form
+            pass
+    return _backoff(attempt)
+
+def _should_retry(response: httpx.Response, read_only: bool) -> bool:
+    """Whether a response status means the request can safely be sent again"""
+    if read_only:
+        return response.status_code in RETRY_STATUSES
+    return response.status_code in WRITE_RETRY_STATUSES and "Retry-After" in response.headers
+
+async def _send_with_retry(endpoint: str, method: str, body: Optional[bytes] = None) -> httpx.Response:
+    """Send a request, retrying connection failures, read timeouts and transient statuses
+    
+    Read timeouts and gateway errors are only retried for read-only calls: a
+    state-changing POST such as a simulation may still be running on the
+    server. Writes are resent only after an explicit refusal (429/503 with
+    Retry-After).
+    """
+    read_only = _is_read_only(endpoint, method)
+    for attempt in range(MAX_ATTEMPTS):
+        last_attempt = attempt == MAX_ATTEMPTS - 1
+        try:
+            response = await _send(endpoint, method, body)
+        except (httpx.ConnectError, httpx.ReadTimeout) as e:
+            if last_attempt or (isinstance(e, httpx.ReadTimeout) and not read_only):
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        if last_attempt or not _should_retry(response, read_only):
+            return response
+        await asyncio.sleep(_retry_delay(response, attempt))
 
-def test_endpoint(endpoint: str, method: str = "GET", data: Dict = None) -> Dict[str, Any]:
-    """Test an API endpoint and return the response"""
+async def _request(endpoint: str, method: str, body: Optional[bytes] = None) -> Dict[str, Any]:
+    """Send a request and wrap the outcome as a success/error dict"""
     try:
-        if method == "GET":
-            response = requests.get(f"{BASE_URL}{endpoint}")
-        elif method == "POST":
-            response = requests.post(f"{BASE_URL}{endpoint}", json=data)
+        response = await _send_with_retry(endpoint, method, body)
+        HTTP_VERSIONS.add(response.http_version)
         
         if response.status_code == 200:
-            return {"success": True, "data": response.json()}
+            return {"success": True, "data": _json_loads(response.content)}
         else:
             return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         return {"success": False, "error": "Connection failed - make sure the server is running"}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def run_rwanda_features_test():
-    """Run comprehensive tests of Rwanda-specific features"""
-    print("🇷🇼 Testing Rwanda Quantum Agricultural Intelligence Platform")
-    print("=" * 60)
-    
-    # Test 1: Initialize Rwanda demo molecules
-    print("\n1. Testing Rwanda Demo Molecules Initialization...")
-    result = test_endpoint("/initialize_rwanda_molecules", "POST")
-    if result["success"]:
-        print(f"✅ Successfully initialized {len(result['data']['added_molecules'])} molecules")
-        for molecule in result['data']['added_molecules']:
-            print(f"   - {molecule['name']} ({molecule['category']})")
-    else:
-        print(f"❌ Failed: {result['error']}")
-    
-    # Test 2: Get Rwanda demo molecules info
-    print("\n2. Testing Rwanda Demo Molecules Info...")
-    result = test_endpoint("/rwanda_demo_molecules")
-    if result["success"]:
-        print(f"✅ Found {result['data']['total_molecules']} Rwanda-relevant molecules")
-        for key, molecule in result['data']['molecules'].items():
-            print(f"   - {molecule['name']}: {molecule['rwanda_relevance'][:50]}...")
-    else:
-        print(f"❌ Failed: {result['error']}")
-    
-    # Test 3: Get agricultural recommendations for different scenarios
-    print("\n3. Testing Agricultural Recommendations...")
+async def test_endpoint(endpoint: str, method: str = "GET", data: Dict = None,
+                        body: Optional[bytes] = None) -> Dict[str, Any]:
+    """Test an API endpoint and return the response
     
-    test_scenarios = [
-        {"crop_type": "maize", "district": "nyagatare"},
-        {"crop_type": "coffee", "district": "huye"},
-        {"pest_issue": "fall_armyworm"},
-        {"nutrient_deficiency": "iron"},
-        {"crop_type": "beans", "nutrient_deficiency": "iron", "district": "gatsibo"}
-    ]
+    POST payloads are given either as data or already serialized as body
+    (see _json_dumps); they are encoded once, not per retry.
+    """
+    if body is None and data is not None:
+        body = _json_dumps(data)
+    return await _request(endpoint, method, body)
+
+async def warm_up():
+    """Prime the server and connection pool with concurrent no-op GETs
     
-    for scenario in test_scenarios:
-        result = test_endpoint("/rwanda_agricultural_recommendations", "POST", scenario)
-        if result["success"]:
-            data = result["data"]
-            print(f"✅ Scenario {scenario}: {data['total_recommendations']} recommendations")
-            for rec in data['recommendations']:
-                print(f"   - {rec['molecule']}: {rec['reason']}")
-            if data.get('location_specific_notes'):
-                print(f"   📍 Location notes: {', '.join(data['location_specific_notes'])}")
-        else:
-            print(f"❌ Scenario {scenario} failed: {result['error']}")
+    A fresh uvicorn worker pays route setup and model compilation on its
+    first requests; doing that here keeps it out of the measured suites.
+    Failures are ignored - an unreachable server is reported by the tests.
+    """
+    await asyncio.gather(*[CLIENT.get("/health") for _ in range(WARMUP_REQUESTS)],
+                         return_exceptions=True)
+
+@contextmanager
+def buffered_output():
+    """Collect everything printed in the block and write it to stdout at once
     
-    # Test 4: Get Rwanda molecule statistics
-    print("\n4. Testing Rwanda Molecule Statistics...")
-    result = test_endpoint("/rwanda_molecule_statistics")
-    if result["success"]:
-        stats = result["data"]
-        print(f"✅ Total Rwanda molecules: {stats['total_rwanda_molecules']}")
-        print("   Categories:")
-        for category, count in stats['by_category'].items():
-            print(f"   - {category}: {count}")
-    else:
-        print(f"❌ Failed: {result['error']}")
+    The output is written even if the block raises.
+    """
+    buf = io.StringIO()
+    try:
+        with redirect_stdout(buf):
+            yield
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+def _print_lines(lines):
+    """Print pre-formatted lines with a single write (nothing for no lines)"""
+    text = "\n".join(lines)
+    if text:
+        sys.stdout.write(text + "\n")
+
+async def search_molecules(query: str, limit: int = 5) -> Dict[str, Any]:
+    """Search molecules by name"""
+    return await test_endpoint("/search_molecules", "POST", {"query": query, "limit": limit})
+
+async def search_molecules_batch(queries: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+    """Run several searches in one /search_molecules/batch round-trip
     
-    # Test 5: Get crop-pest matrix
-    print("\n5. Testing Crop-Pest-Solution Matrix...")
-    result = test_endpoint("/rwanda_crop_pest_matrix")
+    Returns one search_molecules()-shaped result per query; repeated queries
+    are sent once and share a result. Servers without the batch endpoint get
+    the searches sent concurrently instead.
+    """
+    unique = list(dict.fromkeys(queries))
+    if not unique:
+        return []
+    body = {"searches": [{"query": query, "limit": limit} for query in unique]}
+    result = await test_endpoint("/search_molecules/batch", "POST", body)
     if result["success"]:
-        matrix = result["data"]["crop_pest_matrix"]
-        print(f"✅ Matrix covers {result['data']['total_crops']} crops")
-        for crop, info in matrix.items():
-            print(f"   - {crop.upper()}:")
-            print(f"     Pests: {', '.join(info['major_pests'])}")
-            print(f"     Solutions: {', '.join(info['recommended_molecules'])}")
-            print(f"     Seasons: {', '.join(info['seasonal_considerations'])}")
+        results = [{"success": True, "data": data} for data in result["data"]["results"]]
     else:
-        print(f"❌ Failed: {result['error']}")
+        results = await asyncio.gather(*[search_molecules(query, limit) for query in unique])
+    by_query = dict(zip(unique, results))
+    return [by_query[query] for query in queries]
+
+# Recommendation scenarios and search terms probed by run_rwanda_features_test,
+# with their request bodies serialized once up front
+TEST_SCENARIOS = [
+    {"crop_type": "maize", "district": "nyagatare"},
+    {"crop_type": "coffee", "district": "huye"},
+    {"pest_issue": "fall_armyworm"},
+    {"nutrient_deficiency": "iron"},
+    {"crop_type": "beans", "nutrient_deficiency": "iron", "district": "gatsibo"}
+]
+SEARCH_QUERIES = ["neem", "urea", "caffeine", "iron"]
+SCENARIO_BODIES = [_json_dumps(scenario) for scenario in TEST_SCENARIOS]
+SEARCH_BODIES = [_json_dumps({"query": query, "limit": 5}) for query in SEARCH_QUERIES]
+
+# Fixed closing summaries, built once
+FEATURES_SUMMARY = "\n".join([
+    "\n" + "=" * 60,
+    "🎉 Rwanda Agricultural Intelligence Platform Testing Complete!",
+    "\nKey Features Demonstrated:",
+    "✓ Rwanda-relevant agricultural molecules (6 types)",
+    "✓ Crop-specific recommendations",
+    "✓ Pest management solutions",
+    "✓ Nutrient deficiency treatments",
+    "✓ Location-based agricultural advice",
+    "✓ Molecular database integration",
+    "✓ Quantum simulation capabilities",
+    "\nThis platform addresses:",
+    "🌾 Fall armyworm in maize (65% nitrogen deficiency)",
+    "☕ Coffee berry borer (major export crop)",
+    "🫘 Iron deficiency in beans (38% prevalence)",
+    "🧪 Organic pesticide alternatives",
+    "💚 Sustainable agricultural practices",
+])
+
+SCENARIO_SUMMARY = "\n".join([
+    "\n💡 This demonstrates how the platform provides:",
+    "   ✓ Targeted molecular solutions",
+    "   ✓ Location-specific advice",
+    "   ✓ Integrated pest and crop management",
+    "   ✓ Scientific backing for recommendations",
+])
+
+async def run_rwanda_features_test():
+    """Run comprehensive tests of Rwanda-specific features"""
+    with buffered_output():
+        print("🇷🇼 Testing Rwanda Quantum Agricultural Intelligence Platform")
+        print("=" * 60)
+        
+        # Test 1: Initialize Rwanda demo molecules
+        print("\n1. Testing Rwanda Demo Molecules Initialization...")
+        result = await test_endpoint("/initialize_rwanda_molecules", "POST")
+        if result["success"]:
+            added = result['data']['added_molecules']
+            print(f"✅ Successfully initialized {len(added)} molecules")
+            _print_lines(f"   - {m['name']} ({m['category']})" for m in added)
+        else:
+            print(f"❌ Failed: {result['error']}")
     
-    # Test 6: Search for specific molecules
-    print("\n6. Testing Molecule Search...")
-    search_queries = ["neem", "urea", "caffeine", "iron"]
+    # Tests 2-6 only depend on initialization, so fetch them all at once
+    # and report each section in order once everything is back
+    info_result, scenario_results, stats_result, matrix_result, search_results = await asyncio.gather(
+        test_endpoint("/rwanda_demo_molecules"),
+        asyncio.gather(*[
+            test_endpoint("/rwanda_agricultural_recommendations", "POST", body=body)
+            for body in SCENARIO_BODIES
+        ]),
+        test_endpoint("/rwanda_molecule_statistics"),
+        test_endpoint("/rwanda_crop_pest_matrix"),
+        asyncio.gather(*[
+            test_endpoint("/search_molecules", "POST", body=body) for body in SEARCH_BODIES
+        ])
+    )
     
-    for query in search_queries:
-        search_data = {"query": query, "limit": 5}
-        result = test_endpoint("/search_molecules", "POST", search_data)
+    with buffered_output():
+        # Test 2: Get Rwanda demo molecules info
+        print("\n2. Testing Rwanda Demo Molecules Info...")
+        result = info_result
+        if result["success"]:
+            data = result['data']
+            print(f"✅ Found {data['total_molecules']} Rwanda-relevant molecules")
+            _print_lines(f"   - {m['name']}: {m['rwanda_relevance'][:50]}..." for m in data['molecules'].values())
+        else:
+            print(f"❌ Failed: {result['error']}")
+        
+        # Test 3: Get agricultural recommendations for different scenarios
+        print("\n3. Testing Agricultural Recommendations...")
+        for scenario, result in zip(TEST_SCENARIOS, scenario_results):
+            if result["success"]:
+                data = result["data"]
+                print(f"✅ Scenario {scenario}: {data['total_recommendations']} recommendations")
+                _print_lines(f"   - {r['molecule']}: {r['reason']}" for r in data['recommendations'])
+                notes = data.get('location_specific_notes')
+                if notes:
+                    print(f"   📍 Location notes: {', '.join(notes)}")
+            else:
+                print(f"❌ Scenario {scenario} failed: {result['error']}")
+        
+        # Test 4: Get Rwanda molecule statistics
+        print("\n4. Testing Rwanda Molecule Statistics...")
+        result = stats_result
+        if result["success"]:
+            stats = result["data"]
+            print(f"✅ Total Rwanda molecules: {stats['total_rwanda_molecules']}")
+            print("   Categories:")
+            _print_lines(f"   - {category}: {count}" for category, count in stats['by_category'].items())
+        else:
+            print(f"❌ Failed: {result['error']}")
+        
+        # Test 5: Get crop-pest matrix
+        print("\n5. Testing Crop-Pest-Solution Matrix...")
+        result = matrix_result
         if result["success"]:
             data = result["data"]
-            print(f"✅ Search '{query}': {data['total_found']} found, {data['returned_count']} returned")
-            for molecule in data['molecules']:
-                print(f"   - {molecule['name']} ({molecule['category']})")
+            print(f"✅ Matrix covers {data['total_crops']} crops")
+            _print_lines(
+                f"   - {crop.upper()}:\n"
+                f"     Pests: {', '.join(info['major_pests'])}\n"
+                f"     Solutions: {', '.join(info['recommended_molecules'])}\n"
+                f"     Seasons: {', '.join(info['seasonal_considerations'])}"
+                for crop, info in data["crop_pest_matrix"].items()
+            )
         else:
-            print(f"❌ Search '{query}' failed: {result['error']}")
+            print(f"❌ Failed: {result['error']}")
+        
+        # Test 6: Search for specific molecules
+        print("\n6. Testing Molecule Search...")
+        for query, result in zip(SEARCH_QUERIES, search_results):
+            if result["success"]:
+                data = result["data"]
+                print(f"✅ Search '{query}': {data['total_found']} found, {data['returned_count']} returned")
+                _print_lines(f"   - {m['name']} ({m['category']})" for m in data['molecules'])
+            else:
+                print(f"❌ Search '{query}' failed: {result['error']}")
     
     # Test 7: Test molecular simulation on Rwanda molecules
-    print("\n7. Testing Molecular Simulations...")
-    # First get a molecule ID
-    result = test_endpoint("/search_molecules", "POST", {"query": "urea", "limit": 1})
-    if result["success"] and result["data"]["molecules"]:
-        molecule_id = result["data"]["molecules"][0]["id"]
-        sim_result = test_endpoint(f"/simulate_molecule/{molecule_id}", "POST")
-        if sim_result["success"]:
-            print(f"✅ Simulation successful for molecule ID {molecule_id}")
-            if sim_result["data"].get("success"):
-                print(f"   Energy: {sim_result['data'].get('classical_energy', 'N/A')}")
-                print(f"   Method: {sim_result['data'].get('method', 'N/A')}")
-        else:
-            print(f"❌ Simulation failed: {sim_result['error']}")
+    with buffered_output():
+        print("\n7. Testing Molecular Simulations...")
+        # First get a molecule ID
+        result = await search_molecules("urea", 1)
+        if result["success"] and result["data"]["molecules"]:
+            molecule_id = result["data"]["molecules"][0]["id"]
+            sim_result = await test_endpoint(f"/simulate_molecule/{molecule_id}", "POST")
+            if sim_result["success"]:
+                print(f"✅ Simulation successful for molecule ID {molecule_id}")
+                get = sim_result["data"].get
+                if get("success"):
+                    print(f"   Energy: {get('classical_energy', 'N/A')}")
+                    print(f"   Method: {get('method', 'N/A')}")
+            else:
+                print(f"❌ Simulation failed: {sim_result['error']}")
     
     # Test 8: Database statistics
-    print("\n8. Testing Database Statistics...")
-    result = test_endpoint("/database_stats")
-    if result["success"]:
-        stats = result["data"]["stats"]
-        print(f"✅ Database contains {stats['total_molecules']} total molecules")
-        print(f"   Average molecular weight: {stats.get('avg_molecular_weight', 0):.2f}")
-        print(f"   Total simulations: {stats['total_simulations']}")
-        print("   Molecules by category:")
-        for category, count in stats.get('molecules_by_category', {}).items():
-            print(f"   - {category}: {count}")
-    else:
-        print(f"❌ Failed: {result['error']}")
-    
-    print("\n" + "=" * 60)
-    print("🎉 Rwanda Agricultural Intelligence Platform Testing Complete!")
-    print("\nKey Features Demonstrated:")
-    print("✓ Rwanda-relevant agricultural molecules (6 types)")
-    print("✓ Crop-specific recommendations")
-    print("✓ Pest management solutions")
-    print("✓ Nutrient deficiency treatments")
-    print("✓ Location-based agricultural advice")
-    print("✓ Molecular database integration")
-    print("✓ Quantum simulation capabilities")
-    print("\nThis platform addresses:")
-    print("🌾 Fall armyworm in maize (65% nitrogen deficiency)")
-    print("☕ Coffee berry borer (major export crop)")
-    print("🫘 Iron deficiency in beans (38% prevalence)")
-    print("🧪 Organic pesticide alternatives")
-    print("💚 Sustainable agricultural practices")
-
-def test_specific_rwanda_scenario():
+    with buffered_output():
+        print("\n8. Testing Database Statistics...")
+        result = await test_endpoint("/database_stats")
+        if result["success"]:
+            stats = result["data"]["stats"]
+            print(f"✅ Database contains {stats['total_molecules']} total molecules")
+            print(f"   Average molecular weight: {stats.get('avg_molecular_weight', 0):.2f}")
+            print(f"   Total simulations: {stats['total_simulations']}")
+            print("   Molecules by category:")
+            _print_lines(f"   - {category}: {count}"
+                         for category, count in stats.get('molecules_by_category', {}).items())
+        else:
+            print(f"❌ Failed: {result['error']}")
+        
+        print(FEATURES_SUMMARY)
+
+async def test_specific_rwanda_scenario():
     """Test a specific Rwanda agricultural scenario"""
-    print("\n" + "=" * 60)
-    print("🎯 SPECIFIC RWANDA SCENARIO TEST")
-    print("Scenario: Maize farmer in Eastern Province with fall armyworm problem")
-    print("=" * 60)
-    
-    # Get recommendations for this specific scenario
-    scenario = {
-        "crop_type": "maize",
-        "pest_issue": "fall_armyworm",
-        "district": "nyagatare"
-    }
-    
-    result = test_endpoint("/rwanda_agricultural_recommendations", "POST", scenario)
-    if result["success"]:
-        data = result["data"]
-        print(f"📋 Recommendations for Eastern Province maize farmer:")
-        print(f"   Total solutions: {data['total_recommendations']}")
+    with buffered_output():
+        print("\n" + "=" * 60)
+        print("🎯 SPECIFIC RWANDA SCENARIO TEST")
+        print("Scenario: Maize farmer in Eastern Province with fall armyworm problem")
+        print("=" * 60)
         
-        for rec in data['recommendations']:
-            print(f"\n🧪 {rec['molecule']}")
-            print(f"   Reason: {rec['reason']}")
-            
-            # Get detailed molecule info
-            search_result = test_endpoint("/search_molecules", "POST", {"query": rec['molecule'].split()[0], "limit": 1})
-            if search_result["success"] and search_result["data"]["molecules"]:
-                molecule = search_result["data"]["molecules"][0]
-                print(f"   Category: {molecule['category']}")
-                print(f"   Description: {molecule.get('description', 'N/A')[:100]}...")
+        # Get recommendations for this specific scenario
+        scenario = {
+            "crop_type": "maize",
+            "pest_issue": "fall_armyworm",
+            "district": "nyagatare"
+        }
         
-        if data.get('location_specific_notes'):
-            print(f"\n📍 Location-specific advice:")
-            for note in data['location_specific_notes']:
-                print(f"   - {note}")
-    
-    print("\n💡 This demonstrates how the platform provides:")
-    print("   ✓ Targeted molecular solutions")
-    print("   ✓ Location-specific advice")
-    print("   ✓ Integrated pest and crop management")
-    print("   ✓ Scientific backing for recommendations")
+        result = await test_endpoint("/rwanda_agricultural_recommendations", "POST", scenario)
+        if result["success"]:
+            data = result["data"]
+            print(f"📋 Recommendations for Eastern Province maize farmer:")
+            print(f"   Total solutions: {data['total_recommendations']}")
+        
+            # Get detailed molecule info for every recommendation in one call
+            recs = data['recommendations']
+            details = await search_molecules_batch([rec['molecule'].split()[0] for rec in recs], 1)
+        
+            for rec, search_result in zip(recs, details):
+                print(f"\n🧪 {rec['molecule']}")
+                print(f"   Reason: {rec['reason']}")
+        
+                if search_result["success"] and search_result["data"]["molecules"]:
+                    molecule = search_result["data"]["molecules"][0]
+                    print(f"   Category: {molecule['category']}")
+                    print(f"   Description: {molecule.get('description', 'N/A')[:100]}...")
+        
+            notes = data.get('location_specific_notes')
+            if notes:
+                print(f"\n📍 Location-specific advice:")
+                _print_lines(f"   - {note}" for note in notes)
+        
+        print(SCENARIO_SUMMARY)
 
-if __name__ == "__main__":
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Test Rwanda agricultural features against a running API")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"maximum in-flight requests (default: {MAX_CONCURRENCY})")
+    parser.add_argument("--no-prompt", action="store_true",
+                        help="start immediately instead of waiting for Enter")
+    parser.add_argument("--scenario-only", action="store_true",
+                        help="run only the specific maize/fall armyworm scenario")
+    parser.add_argument("--http2", action="store_true",
+                        help="speak HTTP/2 over cleartext without negotiation (h2c servers only)")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.http2 and not HTTP2_AVAILABLE:
+        parser.error("--http2 requires the h2 package (pip install 'httpx[http2]')")
+    return args
+
+async def main(argv: Optional[List[str]] = None):
+    """Run both suites in one event loop on a single shared client"""
+    global CLIENT, SEM
+    args = parse_args(argv)
+    
     print("Starting Rwanda Agricultural Intelligence Platform Tests...")
-    print("Make sure the FastAPI server is running on http://localhost:8000")
+    print(f"Make sure the FastAPI server is running on {BASE_URL}")
     print("You can start it with: uvicorn main:app --reload")
     
-    input("Press Enter to continue with testing...")
+    if not args.no_prompt:
+        input("Press Enter to continue with testing...")
+    
+    SEM = asyncio.Semaphore(args.concurrency)
+    async with create_client(h2c=args.http2) as client:
+        CLIENT = client
+        await warm_up()
+        if not args.scenario_only:
+            await run_rwanda_features_test()
+        await test_specific_rwanda_scenario()
     
-    run_rwanda_features_test()
-    test_specific_rwanda_scenario()
+    if HTTP_VERSIONS:
+        print(f"\nHTTP protocol: {', '.join(sorted(HTTP_VERSIONS))}")
+
+if __name__ == "__main__":
+    asyncio.run(main())